@@ -132,12 +132,12 @@ class DahuaDataUpdateCoordinator(DataUpdateCoordinator):
 
         super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=SCAN_INTERVAL_SECONDS)
 
-    async def async_start_event_listener(self):
+    def start_event_listener(self):
         """ Starts the event listeners for IP cameras (this does not work for doorbells (VTO)) """
         if self.events is not None:
             self.dahua_event.start()
 
-    async def async_start_vto_event_listener(self):
+    def start_vto_event_listener(self):
         """ Starts the event listeners for doorbells (VTO). This will not work for IP cameras"""
         if self.dahua_vto_event_thread is not None:
             self.dahua_vto_event_thread.start()
@@ -171,23 +171,25 @@ class DahuaDataUpdateCoordinator(DataUpdateCoordinator):
                 self.machine_name = data.get("table.General.MachineName")
                 self._serial_number = data.get("serialNumber")
 
-                try:
-                    await self.client.async_get_coaxial_control_io_status()
-                    self._supports_coaxial_control = True
-                except ClientError as exception:
-                    self._supports_coaxial_control = False
+                # Probe the optional APIs concurrently. A ClientError means the API isn't supported
+                probes = await asyncio.gather(
+                    self.client.async_get_coaxial_control_io_status(),
+                    self.client.async_get_disarming_linkage(),
+                    return_exceptions=True,
+                )
+                for probe in probes:
+                    if isinstance(probe, BaseException) and not isinstance(probe, ClientError):
+                        raise probe
 
-                try:
-                    await self.client.async_get_disarming_linkage()
-                    self._supports_disarming_linkage = True
-                except ClientError as exception:
-                    self._supports_disarming_linkage = False
+                coaxial_control, disarming_linkage = probes
+                self._supports_coaxial_control = not isinstance(coaxial_control, ClientError)
+                self._supports_disarming_linkage = not isinstance(disarming_linkage, ClientError)
 
                 is_doorbell = self.is_doorbell()
 
                 if not is_doorbell:
                     # Start the event listeners for IP cameras
-                    await self.async_start_event_listener()
+                    self.start_event_listener()
 
                     try:
                         # Some cams don't support profile modes, check and see... use 2 to check
@@ -201,7 +203,7 @@ class DahuaDataUpdateCoordinator(DataUpdateCoordinator):
                         self._supports_profile_mode = False
                 else:
                     # Start the event listeners for door bells (VTO)
-                    await self.async_start_vto_event_listener()
+                    self.start_vto_event_listener()
 
                 self.initialized = True
 
@@ -218,12 +220,18 @@ class DahuaDataUpdateCoordinator(DataUpdateCoordinator):
                     _LOGGER.debug("Could not get profile mode", exc_info=exception)
                     pass
 
-            # Figure out which APIs we need to call and then fan out and gather the results
+            # Figure out which configs we need and read them all with a single request. The motion detection and IR
+            # light configs are always needed (this is the same as async_common_config)
+            config_names = ["MotionDetect", "Lighting[0][{0}]".format(self._profile_mode)]
+            if self._supports_disarming_linkage:
+                config_names.append("DisableLinkage")
+            if self.supports_security_light():
+                config_names.append("Lighting_V2")
+
+            # Fan out to the other APIs and gather the results
             coros = [
-                asyncio.ensure_future(self.client.async_common_config(self._profile_mode)),
+                asyncio.ensure_future(self.client.async_get_configs(config_names)),
             ]
-            if self._supports_disarming_linkage:
-                coros.append(asyncio.ensure_future(self.client.async_get_disarming_linkage()))
             if self._supports_coaxial_control:
                 coros.append(asyncio.ensure_future(self.client.async_get_coaxial_control_io_status()))
             results = await asyncio.gather(*coros)
@@ -231,10 +239,6 @@ class DahuaDataUpdateCoordinator(DataUpdateCoordinator):
             for result in results:
                 data.update(result)
 
-            if self.supports_security_light():
-                light_v2 = await self.client.async_get_lighting_v2()
-                data.update(light_v2)
-
             return data
         except Exception as exception:
             _LOGGER.warning("Failed to sync device state", exc_info=exception)
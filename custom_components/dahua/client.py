@@ -1,9 +1,12 @@
 """Dahua API Client."""
 import logging
+import re
 import socket
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Tuple
+from urllib.parse import quote
 import asyncio
 import aiohttp
-import async_timeout
 from custom_components.dahua.const import STREAM_MAIN, STREAM_SUB
 
 from .digest import DigestAuth
@@ -11,9 +14,68 @@ from .digest import DigestAuth
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
 TIMEOUT_SECONDS = 5
+STREAM_READ_SIZE = 8192
+MAX_CONCURRENT_REQUESTS = 4
+REQUEST_ATTEMPTS = 3
+# Cameras that are power cycling are usually slow to accept the connection, so that gets a shorter timeout
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=TIMEOUT_SECONDS, connect=2, sock_read=4)
 SECURITY_LIGHT_TYPE = 1
 SIREN_TYPE = 2
 
+# The API endpoints. The ones with placeholders are filled in with str.format
+_URL_RTSP = "/cam/realmonitor?channel={0}&subtype={1}"
+_URL_SNAPSHOT = "/cgi-bin/snapshot.cgi?channel={0}"
+_URL_SYSTEM_INFO = "/cgi-bin/magicBox.cgi?action=getSystemInfo"
+_URL_SOFTWARE_VERSION = "/cgi-bin/magicBox.cgi?action=getSoftwareVersion"
+_URL_MACHINE_NAME = "/cgi-bin/magicBox.cgi?action=getMachineName"
+_URL_VENDOR = "/cgi-bin/magicBox.cgi?action=getVendor"
+_URL_COAXIAL_CONTROL_IO_STATUS = "/cgi-bin/coaxialControlIO.cgi?action=getStatus&channel=1"
+_URL_COAXIAL_CONTROL = "/cgi-bin/coaxialControlIO.cgi?action=control&channel=0&info[0].Type={0}&info[0].IO={1}"
+_URL_EVENTS = "/cgi-bin/eventManager.cgi?action=attach&codes=[{0}]&heartbeat=2"
+_URL_CONFIG_MANAGER = "/cgi-bin/configManager.cgi?"
+_URL_LIGHTING_V2 = _URL_CONFIG_MANAGER + "action=getConfig&name=Lighting_V2"
+_URL_GENERAL = _URL_CONFIG_MANAGER + "action=getConfig&name=General"
+_URL_VIDEO_IN_MODE = _URL_CONFIG_MANAGER + "action=getConfig&name=VideoInMode"
+_URL_DISARMING_LINKAGE = _URL_CONFIG_MANAGER + "action=getConfig&name=DisableLinkage"
+_URL_CONFIG = _URL_CONFIG_MANAGER + "action=getConfig&name={0}"
+_URL_SET_CONFIG = _URL_CONFIG_MANAGER + "action=setConfig&"
+_URL_SET_LIGHTING_V1 = _URL_SET_CONFIG + "Lighting[0][0].Mode={0}&Lighting[0][0].MiddleLight[0].Light={1}"
+_URL_SET_LIGHTING_V2 = _URL_SET_CONFIG + "Lighting_V2[0][{0}][0].Mode={1}&Lighting_V2[0][{0}][0].MiddleLight[0].Light={2}"
+_URL_SET_VIDEO_PROFILE_MODE = _URL_SET_CONFIG + "VideoInMode[0].Config[0]={0}"
+_URL_SET_CHANNEL_TITLE = _URL_SET_CONFIG + "ChannelTitle[{0}].Name={1}"
+_URL_SET_TEXT_OVERLAY = _URL_SET_CONFIG + "VideoWidget[{0}].CustomTitle[{1}].Text={2}"
+_URL_SET_CUSTOM_OVERLAY = _URL_SET_CONFIG + "VideoWidget[{0}].UserDefinedTitle[{1}].Text={2}"
+_URL_SET_DISARMING_LINKAGE = _URL_SET_CONFIG + "DisableLinkage[0].Enable={0}"
+_URL_SET_RECORD_MODE = _URL_SET_CONFIG + "RecordMode[0].Mode={0}"
+_URL_ENABLE_MOTION_DETECTION = _URL_SET_CONFIG + "MotionDetect[0].Enable={0}&MotionDetect[0].DetectVersion=V3.0"
+_URL_ENABLE_MOTION_DETECTION_LEGACY = _URL_SET_CONFIG + "MotionDetect[0].Enable={0}"
+
+# Matches a key=value line of an API response. A line without an "=" is matched as just the key
+_KEY_VALUE_RE = re.compile(r"^([^=\r\n]+)(=?)([^\r\n]*)", re.MULTILINE)
+_KEY_VALUE_BYTES_RE = re.compile(rb"^([^=\r\n]+)(=?)([^\r\n]*)", re.MULTILINE)
+
+_STREAM_NAME_TO_SUBTYPE = {STREAM_MAIN: 0, STREAM_SUB: 1}
+_SUBTYPE_TO_STREAM_NAME = {0: STREAM_MAIN, 1: STREAM_SUB}
+
+# Maps the lower case mode names accepted by the setters to the values the API expects
+_LIGHTING_V1_MODES = {"on": "Manual", "manual": "Manual", "off": "Off", "auto": "Auto"}
+_VIDEO_PROFILE_MODES = {"day": "0", "night": "1"}
+_RECORD_MODES = {"auto": "0", "manual": "1", "on": "1", "off": "2"}
+
+# Config keys of the overlays, used with async_set_configs
+_CHANNEL_TITLE_ENCODE_BLEND = "VideoWidget[{0}].ChannelTitle.EncodeBlend".format
+_TIME_TITLE_ENCODE_BLEND = "VideoWidget[{0}].TimeTitle.EncodeBlend".format
+_CUSTOM_TITLE_ENCODE_BLEND = "VideoWidget[{0}].CustomTitle[{1}].EncodeBlend".format
+_USER_DEFINED_TITLE_ENCODE_BLEND = "VideoWidget[{0}].UserDefinedTitle[{1}].EncodeBlend".format
+
+
+def _is_ok(response: dict) -> bool:
+    """
+    Returns true if the parsed API response is the success response. Dahua returns a single "OK" line, which
+    parse_dahua_api_response stores as the "OK" key. get() returns None if the request failed
+    """
+    return response is not None and ("OK" in response or "ok" in response)
+
 
 class DahuaClient:
     """
@@ -23,6 +85,18 @@ class DahuaClient:
     events is the list of events used to monitor on the camera (For example, motion detection)
     """
 
+    # The attributes are fixed, so use slots for faster attribute access and a smaller instance
+    __slots__ = (
+        "_username", "_password", "_address", "_session", "_port", "_rtsp_port", "_base", "_auth", "_semaphore",
+        "_rtsp_url", "_rtsp_urls", "_snapshot_url", "_system_info_url", "_software_version_url", "_machine_name_url",
+        "_vendor_url", "_coaxial_control_io_status_url", "_coaxial_control_url", "_events_url_template", "_events",
+        "_events_url", "_config_manager_url", "_lighting_v2_url", "_general_url", "_video_in_mode_url",
+        "_disarming_linkage_url", "_config_url", "_set_config_url", "_set_lighting_v1_url", "_set_lighting_v2_url",
+        "_set_video_profile_mode_url", "_set_channel_title_url", "_set_text_overlay_url", "_set_custom_overlay_url",
+        "_set_disarming_linkage_url", "_set_record_mode_url", "_enable_motion_detection_url",
+        "_enable_motion_detection_legacy_url",
+    )
+
     def __init__(
             self,
             username: str,
@@ -40,26 +114,80 @@ class DahuaClient:
         self._rtsp_port = rtsp_port
         self._base = "http://{0}:{1}".format(address, port)
 
+        # Shared across requests so the digest challenge is remembered and sent preemptively, avoiding a 401 round
+        # trip on every call
+        self._auth = DigestAuth(username, password, session)
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        # The fully qualified URLs are built once per client. Endpoints that take arguments are kept as bound
+        # str.format methods so each request only has to fill in the values
+        rtsp_credentials = "{0}:{1}".format(username, password).replace("{", "{{").replace("}", "}}")
+        self._rtsp_url = ("rtsp://" + rtsp_credentials + "@{0}:{1}".format(address, rtsp_port) + _URL_RTSP).format
+        # A dictionary of (channel, subtype) to the RTSP url, so the camera entities don't rebuild it on every update
+        self._rtsp_urls: Dict[Tuple[int, int], str] = dict()
+        self._snapshot_url = (self._base + _URL_SNAPSHOT).format
+        self._system_info_url = self._base + _URL_SYSTEM_INFO
+        self._software_version_url = self._base + _URL_SOFTWARE_VERSION
+        self._machine_name_url = self._base + _URL_MACHINE_NAME
+        self._vendor_url = self._base + _URL_VENDOR
+        self._coaxial_control_io_status_url = self._base + _URL_COAXIAL_CONTROL_IO_STATUS
+        self._coaxial_control_url = (self._base + _URL_COAXIAL_CONTROL).format
+        self._events_url_template = (self._base + _URL_EVENTS).format
+        # The event stream URL is cached so reconnects don't rebuild it. It's rebuilt if the events change
+        self._events = None
+        self._events_url = None
+
+        self._config_manager_url = self._base + _URL_CONFIG_MANAGER
+        self._lighting_v2_url = self._base + _URL_LIGHTING_V2
+        self._general_url = self._base + _URL_GENERAL
+        self._video_in_mode_url = self._base + _URL_VIDEO_IN_MODE
+        self._disarming_linkage_url = self._base + _URL_DISARMING_LINKAGE
+        self._config_url = (self._base + _URL_CONFIG).format
+        self._set_config_url = self._base + _URL_SET_CONFIG
+        self._set_lighting_v1_url = (self._base + _URL_SET_LIGHTING_V1).format
+        self._set_lighting_v2_url = (self._base + _URL_SET_LIGHTING_V2).format
+        self._set_video_profile_mode_url = (self._base + _URL_SET_VIDEO_PROFILE_MODE).format
+        self._set_channel_title_url = (self._base + _URL_SET_CHANNEL_TITLE).format
+        self._set_text_overlay_url = (self._base + _URL_SET_TEXT_OVERLAY).format
+        self._set_custom_overlay_url = (self._base + _URL_SET_CUSTOM_OVERLAY).format
+        self._set_disarming_linkage_url = (self._base + _URL_SET_DISARMING_LINKAGE).format
+        self._set_record_mode_url = (self._base + _URL_SET_RECORD_MODE).format
+        self._enable_motion_detection_url = (self._base + _URL_ENABLE_MOTION_DETECTION).format
+        self._enable_motion_detection_legacy_url = (self._base + _URL_ENABLE_MOTION_DETECTION_LEGACY).format
+
     def get_rtsp_stream_url(self, channel: int, subtype: int) -> str:
         """
         Returns the RTSP url for the supplied subtype (subtype is 0=Main stream, 1=Sub stream)
         """
-        url = "rtsp://{0}:{1}@{2}:{3}/cam/realmonitor?channel={4}&subtype={5}".format(
-            self._username,
-            self._password,
-            self._address,
-            self._rtsp_port,
-            channel,
-            subtype,
-        )
+        key = (channel, subtype)
+        url = self._rtsp_urls.get(key)
+        if url is None:
+            url = self._rtsp_urls[key] = self._rtsp_url(channel, subtype)
         return url
 
     async def async_get_snapshot(self, channel: int) -> bytes:
         """
         Takes a snapshot of the camera and returns the binary jpeg data
         """
-        url = "/cgi-bin/snapshot.cgi?channel={0}".format(channel)
-        return await self.get_bytes(url)
+        return await self.get_bytes(self._snapshot_url(channel))
+
+    @asynccontextmanager
+    async def async_stream_snapshot(self, channel: int) -> AsyncIterator[aiohttp.StreamReader]:
+        """
+        Takes a snapshot of the camera and yields the response body as a stream, so a large jpeg can be passed on in
+        chunks instead of first being read in to memory. Errors are raised to the caller. Example:
+
+        async with client.async_stream_snapshot(channel) as body:
+            async for chunk in body.iter_chunked(STREAM_READ_SIZE):
+                ...
+        """
+        async with self._semaphore:
+            response = await self._auth.request("GET", self._snapshot_url(channel), timeout=REQUEST_TIMEOUT)
+            try:
+                response.raise_for_status()
+                yield response.content
+            finally:
+                response.release()
 
     async def async_get_system_info(self) -> dict:
         """
@@ -73,32 +201,28 @@ class DahuaClient:
         updateSerial=IPC-HDW5830R-Z
         updateSerialCloudUpgrade=IPC-HDW5830R-Z:07:01:08:70:52:00:09:0E:03:00:04:8F0:00:00:00:00:00:02:00:00:600
         """
-        url = "/cgi-bin/magicBox.cgi?action=getSystemInfo"
-        return await self.get(url)
+        return await self.get(self._system_info_url)
 
     async def get_software_version(self) -> dict:
         """
         get_software_version returns the device software version (also known as the firmware version). Example response:
         version=2.800.0000016.0.R,build:2020-06-05
         """
-        url = "/cgi-bin/magicBox.cgi?action=getSoftwareVersion"
-        return await self.get(url)
+        return await self.get(self._software_version_url)
 
     async def get_machine_name(self) -> dict:
         """
         get_machine_name returns the device name. Example response:
         name=FrontDoorCam
         """
-        url = "/cgi-bin/magicBox.cgi?action=getMachineName"
-        return await self.get(url)
+        return await self.get(self._machine_name_url)
 
     async def get_vendor(self) -> dict:
         """
         get_vendor returns the vendor. Example response:
         vendor=Dahua
         """
-        url = "/cgi-bin/magicBox.cgi?action=getVendor"
-        return await self.get(url)
+        return await self.get(self._vendor_url)
 
     async def async_get_coaxial_control_io_status(self) -> dict:
         """
@@ -111,8 +235,7 @@ class DahuaClient:
         status.status.Speaker=Off
         status.status.WhiteLight=Off
         """
-        url = "/cgi-bin/coaxialControlIO.cgi?action=getStatus&channel=1"
-        return await self.get(url)
+        return await self.get(self._coaxial_control_io_status_url)
 
     async def async_get_lighting_v2(self) -> dict:
         """
@@ -129,8 +252,7 @@ class DahuaClient:
         table.Lighting_V2[0][2][0].PercentOfMaxBrightness=100
         table.Lighting_V2[0][2][0].Sensitive=3
         """
-        url = "/cgi-bin/configManager.cgi?action=getConfig&name=Lighting_V2"
-        return await self.get(url)
+        return await self.get(self._lighting_v2_url)
 
     async def async_get_machine_name(self) -> dict:
         """
@@ -144,8 +266,7 @@ class DahuaClient:
         table.General.MachineName=Cam4
         table.General.MaxOnlineTime=3600
         """
-        url = "/cgi-bin/configManager.cgi?action=getConfig&name=General"
-        return await self.get(url)
+        return await self.get(self._general_url)
 
     async def async_common_config(self, profile_mode) -> dict:
         """
@@ -160,15 +281,19 @@ class DahuaClient:
         table.Lighting[0][0].Mode=Auto
         table.Lighting[0][0].Sensitive=3
         """
-        url = "/cgi-bin/configManager.cgi?action=getConfig&name=MotionDetect&action=getConfig&name=Lighting[0][{0}]".format(
-            profile_mode
-        )
-        return await self.get(url)
+        return await self.async_get_configs(["MotionDetect", "Lighting[0][{0}]".format(profile_mode)])
 
     async def async_get_config(self, name) -> dict:
         """ async_get_config gets a config by name """
         # example name=Lighting[0][0]
-        url = "/cgi-bin/configManager.cgi?action=getConfig&name={0}".format(name)
+        return await self.get(self._config_url(name))
+
+    async def async_get_configs(self, names: list) -> dict:
+        """
+        async_get_configs gets multiple configs by name with a single request. The responses of all the configs are
+        merged in to one dictionary. Example names: ["MotionDetect", "DisableLinkage"]
+        """
+        url = self._config_manager_url + "&".join(["action=getConfig&name=" + name for name in names])
         return await self.get(url)
 
     async def async_set_lighting_v1(self, enabled: bool, brightness: int) -> dict:
@@ -186,15 +311,10 @@ class DahuaClient:
         Brightness should be between 0 and 100 inclusive. 100 being the brightest
         """
 
-        if mode.lower() == "on":
-            mode = "Manual"
         # Dahua api expects the first char to be capital
-        mode = mode.capitalize()
+        mode = _LIGHTING_V1_MODES.get(mode.lower(), mode.capitalize())
 
-        url = "/cgi-bin/configManager.cgi?action=setConfig&Lighting[0][0].Mode={0}&Lighting[0][0].MiddleLight[0].Light={1}".format(
-            mode, brightness
-        )
-        return await self.get(url)
+        return await self.get(self._set_lighting_v1_url(mode, brightness))
 
     async def async_set_video_profile_mode(self, mode: str):
         """
@@ -202,82 +322,79 @@ class DahuaClient:
         Mode should be one of: Day or Night
         """
 
-        if mode.lower() == "night":
-            mode = "1"
-        else:
-            # Default to "day", which is 0
-            mode = "0"
+        # Default to "day", which is 0
+        mode = _VIDEO_PROFILE_MODES.get(mode.lower(), "0")
 
-        url = "/cgi-bin/configManager.cgi?action=setConfig&VideoInMode[0].Config[0]={0}".format(mode)
-        value = await self.get(url)
-        if "OK" not in value and "ok" not in value:
+        value = await self.get(self._set_video_profile_mode_url(mode))
+        if not _is_ok(value):
             raise Exception("Could not set video profile mode")
 
+    async def async_set_configs(self, pairs: list):
+        """
+        async_set_configs sets several config values with a single setConfig request. pairs is a list of (key, value)
+        tuples, for example [("VideoWidget[0].TimeTitle.EncodeBlend", "true")]. The values are percent-encoded, the keys
+        are sent as is because the API expects the brackets in them unescaped
+        """
+        url = self._set_config_url + "&".join([key + "=" + quote(value, safe="") for key, value in pairs])
+        value = await self.get(url)
+        if not _is_ok(value):
+            raise Exception("Could not set {0}".format(", ".join([key for key, _ in pairs])))
+
     async def async_enable_channel_title(self, channel: int, enabled: bool, ):
         """ async_set_enable_channel_title will enable or disables the camera's channel title overlay """
-        url = "/cgi-bin/configManager.cgi?action=setConfig&VideoWidget[{0}].ChannelTitle.EncodeBlend={1}".format(
-            channel, str(enabled).lower()
-        )
-        value = await self.get(url)
-        if "OK" not in value and "ok" not in value:
-            raise Exception("Could enable/disable channel title")
+        await self.async_set_configs([(_CHANNEL_TITLE_ENCODE_BLEND(channel), str(enabled).lower())])
 
     async def async_enable_time_overlay(self, channel: int, enabled: bool):
         """ async_set_enable_time_overlay will enable or disables the camera's time overlay """
-        url = "/cgi-bin/configManager.cgi?action=setConfig&VideoWidget[{0}].TimeTitle.EncodeBlend={1}".format(
-            channel, str(enabled).lower()
-        )
-        value = await self.get(url)
-        if "OK" not in value and "ok" not in value:
-            raise Exception("Could not enable/disable time overlay")
+        await self.async_set_configs([(_TIME_TITLE_ENCODE_BLEND(channel), str(enabled).lower())])
 
     async def async_enable_text_overlay(self, channel: int, group: int, enabled: bool):
         """ async_set_enable_text_overlay will enable or disables the camera's text overlay """
-        url = "/cgi-bin/configManager.cgi?action=setConfig&VideoWidget[{0}].CustomTitle[{1}].EncodeBlend={2}".format(
-            channel, group, str(enabled).lower()
-        )
-        value = await self.get(url)
-        if "OK" not in value and "ok" not in value:
-            raise Exception("Could not enable/disable text overlay")
+        await self.async_set_configs([(_CUSTOM_TITLE_ENCODE_BLEND(channel, group), str(enabled).lower())])
 
     async def async_enable_custom_overlay(self, channel: int, group: int, enabled: bool):
         """ async_set_enable_custom_overlay will enable or disables the camera's custom overlay """
-        url = "/cgi-bin/configManager.cgi?action=setConfig&VideoWidget[{0}].UserDefinedTitle[{1}].EncodeBlend={2}".format(
-            channel, group, str(enabled).lower()
-        )
-        value = await self.get(url)
-        if "OK" not in value and "ok" not in value:
-            raise Exception("Could not enable/disable customer overlay")
+        await self.async_set_configs([(_USER_DEFINED_TITLE_ENCODE_BLEND(channel, group), str(enabled).lower())])
+
+    async def async_apply_overlay_settings(self, channel: int, settings: dict):
+        """
+        async_apply_overlay_settings enables or disables several overlays at once with a single setConfig request.
+        settings maps the overlay to the enabled value. text_overlay and custom_overlay map the group to the enabled
+        value. Example:
+        {"channel_title": True, "time_overlay": False, "text_overlay": {1: True}, "custom_overlay": {1: False}}
+        """
+        pairs = []
+        if "channel_title" in settings:
+            pairs.append((_CHANNEL_TITLE_ENCODE_BLEND(channel), str(settings["channel_title"]).lower()))
+        if "time_overlay" in settings:
+            pairs.append((_TIME_TITLE_ENCODE_BLEND(channel), str(settings["time_overlay"]).lower()))
+        for group, enabled in settings.get("text_overlay", {}).items():
+            pairs.append((_CUSTOM_TITLE_ENCODE_BLEND(channel, group), str(enabled).lower()))
+        for group, enabled in settings.get("custom_overlay", {}).items():
+            pairs.append((_USER_DEFINED_TITLE_ENCODE_BLEND(channel, group), str(enabled).lower()))
+        if pairs:
+            await self.async_set_configs(pairs)
 
     async def async_set_service_set_channel_title(self, channel: int, text1: str, text2: str):
         """ async_set_service_set_channel_title sets the channel title """
         text = '|'.join(filter(None, [text1, text2]))
-        url = "/cgi-bin/configManager.cgi?action=setConfig&ChannelTitle[{0}].Name={1}".format(
-            channel, text
-        )
-        value = await self.get(url)
-        if "OK" not in value and "ok" not in value:
+        value = await self.get(self._set_channel_title_url(channel, quote(text, safe="")))
+        if not _is_ok(value):
             raise Exception("Could not set text")
 
     async def async_set_service_set_text_overlay(self, channel: int, group: int, text1: str, text2: str, text3: str,
                                                  text4: str):
         """ async_set_service_set_text_overlay sets the video text overlay """
         text = '|'.join(filter(None, [text1, text2, text3, text4]))
-        url = "/cgi-bin/configManager.cgi?action=setConfig&VideoWidget[{0}].CustomTitle[{1}].Text={2}".format(
-            channel, group, text
-        )
-        value = await self.get(url)
-        if "OK" not in value and "ok" not in value:
+        value = await self.get(self._set_text_overlay_url(channel, group, quote(text, safe="")))
+        if not _is_ok(value):
             raise Exception("Could not set text")
 
     async def async_set_service_set_custom_overlay(self, channel: int, group: int, text1: str, text2: str):
         """ async_set_service_set_custom_overlay sets the customer overlay on the video"""
         text = '|'.join(filter(None, [text1, text2]))
-        url = "/cgi-bin/configManager.cgi?action=setConfig&VideoWidget[{0}].UserDefinedTitle[{1}].Text={2}".format(
-            channel, group, text
-        )
-        value = await self.get(url)
-        if "OK" not in value and "ok" not in value:
+        value = await self.get(self._set_custom_overlay_url(channel, group, quote(text, safe="")))
+        if not _is_ok(value):
             raise Exception("Could not set text")
 
     async def async_set_lighting_v2(self, enabled: bool, brightness: int, profile_mode: str) -> dict:
@@ -293,9 +410,7 @@ class DahuaClient:
         mode = "Manual"
         if not enabled:
             mode = "Off"
-        url = "/cgi-bin/configManager.cgi?action=setConfig&Lighting_V2[0][{0}][0].Mode={1}&Lighting_V2[0][{2}][0].MiddleLight[0].Light={3}".format(
-            profile_mode, mode, profile_mode, brightness
-        )
+        url = self._set_lighting_v2_url(profile_mode, mode, brightness)
         _LOGGER.debug("Turning light on: %s", url)
         return await self.get(url)
 
@@ -311,8 +426,23 @@ class DahuaClient:
         table.VideoInMode[0].TimeSection[0][0]=0 00:00:00-24:00:00
         """
 
-        url = "/cgi-bin/configManager.cgi?action=getConfig&name=VideoInMode"
-        return await self.get(url)
+        return await self.get(self._video_in_mode_url)
+
+    async def async_refresh_state(self) -> dict:
+        """
+        async_refresh_state fetches the lighting v2, video in mode, disarming linkage and coaxial control state
+        concurrently and returns them merged in to one dictionary. The configs are read with one request. Only use this
+        with devices that support all of these APIs
+        """
+        results = await asyncio.gather(
+            self.async_get_configs(["Lighting_V2", "VideoInMode", "DisableLinkage"]),
+            self.async_get_coaxial_control_io_status(),
+        )
+
+        data = {}
+        for result in results:
+            data.update(result)
+        return data
 
     async def async_set_coaxial_control_state(self, dahua_type: int, enabled: bool) -> dict:
         """
@@ -328,8 +458,7 @@ class DahuaClient:
         if not enabled:
             io = "2"
 
-        url = "/cgi-bin/coaxialControlIO.cgi?action=control&channel=0&info[0].Type={0}&info[0].IO={1}".format(
-            dahua_type, io)
+        url = self._coaxial_control_url(dahua_type, io)
         _LOGGER.debug("Setting coaxial control state to %s: %s", io, url)
         return await self.get(url)
 
@@ -342,8 +471,7 @@ class DahuaClient:
         if enabled:
             value = "true"
 
-        url = "/cgi-bin/configManager.cgi?action=setConfig&DisableLinkage[0].Enable={0}".format(value)
-        return await self.get(url)
+        return await self.get(self._set_disarming_linkage_url(value))
 
     async def async_set_record_mode(self, mode: str) -> dict:
         """
@@ -351,13 +479,8 @@ class DahuaClient:
         mode should be one of: auto, manual, or off
         """
 
-        if mode.lower() == "auto":
-            mode = "0"
-        elif mode.lower() == "manual" or mode.lower() == "on":
-            mode = "1"
-        elif mode.lower() == "off":
-            mode = "2"
-        url = "/cgi-bin/configManager.cgi?action=setConfig&RecordMode[0].Mode={0}".format(mode)
+        mode = _RECORD_MODES.get(mode.lower(), mode)
+        url = self._set_record_mode_url(mode)
         _LOGGER.debug("Setting record mode: %s", url)
         return await self.get(url)
 
@@ -369,23 +492,19 @@ class DahuaClient:
         table.DisableLinkage.Enable=false
         """
 
-        url = "/cgi-bin/configManager.cgi?action=getConfig&name=DisableLinkage"
-        return await self.get(url)
+        return await self.get(self._disarming_linkage_url)
 
     async def enable_motion_detection(self, enabled: bool) -> dict:
         """
         enable_motion_detection will either enable or disable motion detection on the camera depending on the supplied value
         """
-        url = "/cgi-bin/configManager.cgi?action=setConfig&MotionDetect[0].Enable={0}&MotionDetect[0].DetectVersion=V3.0".format(
-            str(enabled).lower())
-        response = await self.get(url)
+        response = await self.get(self._enable_motion_detection_url(str(enabled).lower()))
 
-        if "OK" in response:
+        if _is_ok(response):
             return response
 
         # Some older cameras do not support the above API, so try this one
-        url = "/cgi-bin/configManager.cgi?action=setConfig&MotionDetect[0].Enable={0}".format(str(enabled).lower())
-        response = await self.get(url)
+        response = await self.get(self._enable_motion_detection_legacy_url(str(enabled).lower()))
 
         return response
 
@@ -441,18 +560,26 @@ class DahuaClient:
         Note: Heartbeat message must be sent before heartbeat timeout
         """
         # Use codes=[All] for all codes
-        codes = ",".join(events)
-        url = "{0}/cgi-bin/eventManager.cgi?action=attach&codes=[{1}]&heartbeat=2".format(self._base, codes)
+        if self._events_url is None or events != self._events:
+            self._events = list(events)
+            self._events_url = self._events_url_template(",".join(events))
+        url = self._events_url
         if self._username is not None and self._password is not None:
             response = None
             try:
-                auth = DigestAuth(self._username, self._password, self._session)
-                response = await auth.request("GET", url)
+                response = await self._auth.request("GET", url)
                 response.raise_for_status()
 
                 # https://docs.aiohttp.org/en/stable/streams.html
-                async for data, _ in response.content.iter_chunks():
-                    on_receive(data)
+                # Read in larger blocks and only hand on_receive complete lines. An event is a single \r\n terminated
+                # line, so this also keeps an event from being split across two callbacks
+                buffer = b""
+                async for data in response.content.iter_chunked(STREAM_READ_SIZE):
+                    buffer += data
+                    end = buffer.rfind(b"\r\n")
+                    if end != -1:
+                        on_receive(buffer[:end + 2])
+                        buffer = buffer[end + 2:]
             except Exception as exception:
                 raise ConnectionError() from exception
             finally:
@@ -460,7 +587,7 @@ class DahuaClient:
                     response.close()
 
     @staticmethod
-    async def parse_dahua_api_response(data: str) -> dict:
+    def parse_dahua_api_response(data: str) -> dict:
         """
         Dahua APIs return back text that looks like this:
 
@@ -469,86 +596,76 @@ class DahuaClient:
 
         We'll convert that to a dictionary like {"key1":"value1", "key2":"value2"}
         """
-        lines = data.splitlines()
-        data_dict = {}
-        for line in lines:
-            parts = line.split("=", 1)
-            if len(parts) == 2:
-                data_dict[parts[0]] = parts[1]
-            else:
-                # We didn't get a key=value. We just got a key. Just stick it in the dictionary and move on
-                data_dict[parts[0]] = line
-        return data_dict
+        # If we didn't get a key=value and just got a key (for example "OK"), the key is stored as its own value
+        return {key: value if separator else key for key, separator, value in _KEY_VALUE_RE.findall(data)}
 
-    async def get_bytes(self, url: str) -> bytes:
-        """Get information from the API. This will return the raw response and not process it"""
-        try:
-            async with async_timeout.timeout(TIMEOUT_SECONDS):
+    @staticmethod
+    def parse_dahua_api_response_bytes(data: bytes) -> dict:
+        """
+        Same as parse_dahua_api_response but works on the raw response body. The keys are ASCII but values such as
+        the machine name or overlay text can be UTF-8, so each key and value is decoded as UTF-8
+        """
+        parsed = {}
+        for key, separator, value in _KEY_VALUE_BYTES_RE.findall(data):
+            key = key.decode("utf-8", "replace")
+            parsed[key] = value.decode("utf-8", "replace") if separator else key
+        return parsed
+
+    async def _read(self, url: str) -> bytes:
+        """
+        Requests the url and returns the response body. Only MAX_CONCURRENT_REQUESTS requests are sent to the device at
+        once because its small HTTP server drops connections beyond that. Requests that fail to connect or that get
+        disconnected are retried with an exponential backoff
+        """
+        async with self._semaphore:
+            for attempt in range(REQUEST_ATTEMPTS):
                 response = None
                 try:
-                    auth = DigestAuth(self._username, self._password, self._session)
-                    response = await auth.request("GET", self._base + url)
+                    response = await self._auth.request("GET", url, timeout=REQUEST_TIMEOUT)
                     response.raise_for_status()
-
                     return await response.read()
+                except (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError) as exception:
+                    if attempt == REQUEST_ATTEMPTS - 1:
+                        raise
+                    _LOGGER.debug("Retrying %s - %s", url, exception)
                 finally:
                     if response is not None:
-                        response.close()
+                        response.release()
 
+                await asyncio.sleep(2 ** attempt * 0.1)
+
+    async def get_bytes(self, url: str) -> bytes:
+        """Get information from the API. This will return the raw response and not process it. url is the fully qualified URL of the endpoint"""
+        try:
+            return await self._read(url)
         except asyncio.TimeoutError as exception:
             _LOGGER.error("Timeout error fetching information from %s - %s", url, exception)
-        except (KeyError, TypeError) as exception:
-            _LOGGER.error("Error parsing information from %s - %s", url, exception)
         except (aiohttp.ClientError, socket.gaierror) as exception:
             _LOGGER.error("Error fetching information from %s - %s", url, exception)
-        except Exception as exception:  # pylint: disable=broad-except
-            _LOGGER.error("Something really wrong happened! - %s", exception)
 
     async def get(self, url: str) -> dict:
-        """Get information from the API."""
-        url = self._base + url
-        data = {}
+        """
+        Get information from the API. url is the fully qualified URL of the endpoint. Client errors are raised to the
+        caller, which uses them to detect unsupported APIs
+        """
         try:
-            async with async_timeout.timeout(TIMEOUT_SECONDS):
-                response = None
-                try:
-                    auth = DigestAuth(self._username, self._password, self._session)
-                    response = await auth.request("GET", url)
-                    response.raise_for_status()
-                    data = await response.text()
-                    return await self.parse_dahua_api_response(data)
-                finally:
-                    if response is not None:
-                        response.close()
+            data = await self._read(url)
+            return self.parse_dahua_api_response_bytes(data)
         except asyncio.TimeoutError as exception:
             _LOGGER.error("TimeoutError fetching information from %s - %s", url, exception)
-        except (KeyError, TypeError) as exception:
-            _LOGGER.error("TypeError parsing information from %s - %s", url, exception)
-        except (aiohttp.ClientError, socket.gaierror) as exception:
-            raise exception
-        except Exception as exception:  # pylint: disable=broad-except
-            _LOGGER.error("Something really wrong happened! - %s", exception)
 
     @staticmethod
     def to_subtype(stream_name: str) -> int:
         """
         Given a stream name (Main or Sub) returns the subtype index. The index is what the API uses
         """
-        if stream_name == STREAM_MAIN:
-            return 0
-        elif stream_name == STREAM_SUB:
-            return 1
-
         # Just default to the main stream
-        return 0
+        return _STREAM_NAME_TO_SUBTYPE.get(stream_name, 0)
 
     @staticmethod
     def to_stream_name(subtype: int) -> str:
         """
         Given the subtype, returns the stream name (Main or Sub)
         """
-        if subtype == 1:
-            return STREAM_SUB
-
         # Just default to the main stream
-        return STREAM_MAIN
\ No newline at end of file
+        return _SUBTYPE_TO_STREAM_NAME.get(subtype, STREAM_MAIN)
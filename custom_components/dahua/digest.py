@@ -28,29 +28,31 @@ class DigestAuth:
         self.last_nonce = previous.get("last_nonce", "")
         self.nonce_count = previous.get("nonce_count", 0)
         self.challenge = previous.get("challenge")
-        self.args = {}
         self.session = session
 
     async def request(self, method, url, *, headers=None, **kwargs):
-        """Makes a request"""
+        """
+        Makes a request. Once a challenge has been seen the Authorization header is sent preemptively, which saves
+        the 401 round trip. If the server rejects it (for example, the nonce went stale) the new challenge is used to
+        retry the request once.
+        """
         if headers is None:
             headers = {}
 
-        # Save the args so we can re-run the request
-        self.args = {"method": method, "url": url, "headers": headers, "kwargs": kwargs}
-
-        if self.challenge:
-            authorization = self._build_digest_header(method.upper(), url)
-            headers["AUTHORIZATION"] = authorization
-
-        response = await self.session.request(method, url, headers=headers, **kwargs)
+        response = await self._request(method, url, headers, **kwargs)
 
         # Only try performing digest authentication if the response status is from 401
         if response.status == 401:
-            return await self._handle_401(response)
+            return await self._handle_401(response, method, url, headers, **kwargs)
 
         return response
 
+    async def _request(self, method, url, headers, **kwargs):
+        if self.challenge:
+            headers["AUTHORIZATION"] = self._build_digest_header(method.upper(), url)
+
+        return await self.session.request(method, url, headers=headers, **kwargs)
+
     def _build_digest_header(self, method, url):
         """
         :rtype: str
@@ -134,7 +136,7 @@ class DigestAuth:
 
         return "Digest %s" % base
 
-    async def _handle_401(self, response: ClientResponse):
+    async def _handle_401(self, response: ClientResponse, method, url, headers, **kwargs):
         """
         Takes the given response and tries digest-auth, if needed.
         :rtype: ClientResponse
@@ -143,17 +145,15 @@ class DigestAuth:
 
         parts = auth_header.split(" ", 1)
         if "digest" == parts[0].lower() and len(parts) > 1:
-            # Close the initial response since we are going making another request and return that response
-            response.close()
+            # Release the initial response since we are going making another request and return that response.
+            # The (small) body is read first so aiohttp can put the connection back in the pool for the retry
+            await response.read()
+            response.release()
 
             self.challenge = parse_key_value_list(parts[1])
 
-            return await self.request(
-                self.args["method"],
-                self.args["url"],
-                headers=self.args["headers"],
-                **self.args["kwargs"],
-            )
+            # Retry only once. If this is rejected too the credentials are wrong and the 401 is returned to the caller
+            return await self._request(method, url, headers, **kwargs)
 
         return response
 